@@ -1,26 +1,31 @@
-import base64
 import streamlit as st
 import os
-import io
-from PIL import Image 
-
-# Add error handling for imports
-try:
-    import pdf2image
-except ImportError as e:
-    st.error(f"Error importing pdf2image: {e}")
-    st.info("Please ensure pdf2image is properly installed. You may need to install poppler-utils system dependencies.")
-    st.stop()
-
-try:
-    import google.generativeai as genai
-except ImportError as e:
-    st.error(f"Error importing google.generativeai: {e}")
-    st.info("Please ensure google-generativeai is properly installed.")
-    st.stop()
+import contextlib
+import datetime
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import NamedTuple
 
 import json
 
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+import llm_cache
+from prompts import (
+    ARCHITECTURE_PROMPT,
+    BRD_PROMPT,
+    CRD_PROMPT,
+    EMAIL_PROMPT,
+    FEASIBILITY_PROMPT,
+    PRE_EXECUTION_PROMPT,
+    ROADMAP_PROMPT,
+    TECHNICAL_PROMPT,
+    build_batch_prompt,
+)
+from rate_limit import RateLimiter
+
 # Initialize Streamlit page - MUST BE FIRST STREAMLIT COMMAND
 st.set_page_config(
     page_title="IT Consulting Assistant",
@@ -47,9 +52,8 @@ try:
             help="Get your API key from https://makersuite.google.com/app/apikey"
         )
         
-    if api_key and api_key != "your_google_api_key_here":
-        genai.configure(api_key=api_key)
-    else:
+    # genai itself is configured lazily, on the first Gemini request
+    if not api_key or api_key == "your_google_api_key_here":
         st.error("⚠️ Please configure your Google API Key")
         st.info("""
         **To get your API key:**
@@ -67,71 +71,351 @@ except Exception as e:
     st.error(f"Error configuring API: {str(e)}")
     st.stop()
 
+# Heavy imports are deferred to first use: every widget interaction reruns this
+# script, and reruns that never touch a PDF or Gemini shouldn't pay for them.
+# The error handling mirrors what the top-level imports used to do.
+def _import_fitz():
+    try:
+        import fitz  # PyMuPDF
+    except ImportError as e:
+        st.error(f"Error importing PyMuPDF: {e}")
+        st.info("Please ensure PyMuPDF is properly installed.")
+        st.stop()
+    return fitz
+
+def _import_genai():
+    try:
+        import google.generativeai as genai
+    except ImportError as e:
+        st.error(f"Error importing google.generativeai: {e}")
+        st.info("Please ensure google-generativeai is properly installed.")
+        st.stop()
+    return genai
+
+# genai.configure() is process-global: models and caches reach the API
+# through whichever key it last set. Every Gemini call enters this gate with
+# its session's key. Calls for the same key run side by side; a session with
+# another key waits for them to finish before reconfiguring, so no request
+# goes out under someone else's key. Reconfiguring also throws away the SDK's
+# open connections, so it only happens when the key actually changes.
+@st.cache_resource(show_spinner=False)
+def _genai_state():
+    return {"api_key": None, "in_flight": 0, "changed": threading.Condition()}
+
+@contextlib.contextmanager
+def _genai_for(google_api_key):
+    genai = _import_genai()
+    state = _genai_state()
+    with state["changed"]:
+        while state["api_key"] != google_api_key and state["in_flight"]:
+            state["changed"].wait()
+        if state["api_key"] != google_api_key:
+            genai.configure(api_key=google_api_key)
+            state["api_key"] = google_api_key
+        state["in_flight"] += 1
+    try:
+        yield genai
+    finally:
+        with state["changed"]:
+            state["in_flight"] -= 1
+            state["changed"].notify_all()
+
+# Read the stylesheet once per process rather than on every rerun
+@st.cache_resource(show_spinner=False)
+def _read_css():
+    with open("style.css") as f:
+        return f.read()
+
 # Load and apply custom CSS
 def load_css():
     try:
-        with open("style.css") as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        css = _read_css()
     except FileNotFoundError:
         st.warning("style.css not found. Some styling may be missing.")
+        return
+    st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
 
 # Custom CSS for card containers
-def create_card(title, content):
-    st.markdown(f"""
+def card_html(title, content):
+    return f"""
         <div class="css-card">
             <h3>{title}</h3>
             <p>{content}</p>
         </div>
-    """, unsafe_allow_html=True)
+    """
+
+def create_card(title, content):
+    st.markdown(card_html(title, content), unsafe_allow_html=True)
+
+# Each st.markdown call is a separate delta to the frontend, so static chrome
+# that always renders together is emitted as a single element
+def section_header(title):
+    st.markdown(f"---\n\n### {title}")
+
+def result_heading(title):
+    return f"### {title}\n\n---"
+
+def render_result(title, body):
+    st.markdown(f"{result_heading(title)}\n\n{body}")
 
 # Load custom CSS
 load_css()
 
-def get_gemini_response(context, pdf_content, prompt):
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+# Analyses default to greedy decoding so the same document, context and prompt
+# always produce the same answer, which is what makes responses cacheable
+GEMINI_TEMPERATURE = float(os.getenv('GEMINI_TEMPERATURE', '0'))
+GENERATION_CONFIG = {'temperature': GEMINI_TEMPERATURE}
+RESPONSE_CACHE_ENABLED = GEMINI_TEMPERATURE == 0
+
+# Upper bound on simultaneous Gemini requests, to stay within per-minute quotas
+MAX_CONCURRENT_REQUESTS = int(os.getenv('GEMINI_MAX_CONCURRENCY', '5'))
+
+# Requests are paced client-side to stay under the per-minute quota
+MAX_REQUESTS_PER_MINUTE = int(os.getenv('GEMINI_MAX_RPM', '500'))
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter():
+    return RateLimiter(max_calls=MAX_REQUESTS_PER_MINUTE, period=60)
+
+# Resolved on the script thread so executor workers can share it
+_rate_limiter = get_rate_limiter()
+
+# Explicit context caching only works with versioned models and content above
+# the API's minimum token count, so it is opt-in via GEMINI_CONTEXT_CACHE=1.
+# What repeats across analyses is the document (plus the user's context), so
+# that is what gets cached; the prompts alone are far below the minimum.
+CONTEXT_CACHE_ENABLED = os.getenv('GEMINI_CONTEXT_CACHE', '').lower() in ('1', 'true', 'yes')
+CONTEXT_CACHE_MODEL = 'models/gemini-1.5-flash-001'
+CONTEXT_CACHE_TTL = datetime.timedelta(minutes=30)
+CONTEXT_CACHE_MIN_TOKENS = 32768
+
+# Rough per-part token costs, used to skip documents too small to cache
+# without a doomed round-trip: ~4 characters per text token, four 768px
+# tiles per page image and one tile per natively read PDF page
+CHARS_PER_TOKEN = 4
+IMAGE_PART_TOKENS = 4 * 258
+PDF_PART_TOKENS = 258
+
+def _estimated_tokens(parts):
+    tokens = 0
+    for part in parts:
+        if isinstance(part, str):
+            tokens += len(part) // CHARS_PER_TOKEN
+        elif part["mime_type"].startswith("image/"):
+            tokens += IMAGE_PART_TOKENS
+        else:
+            tokens += PDF_PART_TOKENS
+    return tokens
+
+# Expire our handle before the server-side cache does. Keyed by a digest of
+# the document; the leading underscore keeps Streamlit from hashing the parts.
+@st.cache_resource(show_spinner=False, ttl=CONTEXT_CACHE_TTL - datetime.timedelta(minutes=5))
+def _cached_document_model(document_key, google_api_key, _contents):
+    """Return a model bound to a server-side cache of _contents, or None if caching is unavailable."""
+    try:
+        with _genai_for(google_api_key) as genai:
+            cache = genai.caching.CachedContent.create(
+                model=CONTEXT_CACHE_MODEL,
+                contents=_contents,
+                ttl=CONTEXT_CACHE_TTL
+            )
+    except Exception:
+        # Remember the failure for the TTL instead of retrying on every click
+        return None
+    return genai.GenerativeModel.from_cached_content(
+        cached_content=cache,
+        generation_config=GENERATION_CONFIG
+    )
+
+def _document_cache_model(context, pdf_content):
+    """Return a model with context and pdf_content cached server-side, or None."""
+    contents = [context, *pdf_content] if context else list(pdf_content)
+    if _estimated_tokens(contents) < CONTEXT_CACHE_MIN_TOKENS:
+        return None
+    document_key = llm_cache.make_key(context, pdf_content, "", model=CONTEXT_CACHE_MODEL, generation_config=None)
+    return _cached_document_model(document_key, api_key, contents)
+
+# Streamlit re-executes this script on every interaction, so a plain
+# module-level model would still be rebuilt per rerun. Keyed by API key
+# because a model keeps the client, and so the key, it first called with.
+@st.cache_resource(show_spinner=False)
+def get_model(google_api_key):
+    return _import_genai().GenerativeModel(GEMINI_MODEL, generation_config=GENERATION_CONFIG)
+
+def _gemini_request(context, pdf_content, prompt):
+    """Pick the key, model and contents for prompt, using a cached document when available."""
+    model = _document_cache_model(context, pdf_content) if CONTEXT_CACHE_ENABLED else None
+    if model is not None:
+        # The context and document are already part of the cached content
+        return api_key, model, [prompt]
+    return api_key, get_model(api_key), [context, *pdf_content, prompt]
+
+# A stored response is only valid for the model and settings that produced
+# it, so changing GEMINI_TEMPERATURE or the model misses the cache instead of
+# replaying old answers. With context caching on, either model may answer.
+def _response_key(context, pdf_content, prompt, generation_config=None):
+    models = [GEMINI_MODEL, CONTEXT_CACHE_MODEL] if CONTEXT_CACHE_ENABLED else [GEMINI_MODEL]
+    return llm_cache.make_key(
+        context, pdf_content, prompt,
+        model=" ".join(models),
+        generation_config={**GENERATION_CONFIG, **(generation_config or {})}
+    )
+
+def _is_transient(exc):
+    # Imported lazily: the SDK (and google.api_core) is loaded by now
+    from google.api_core import exceptions
+    return isinstance(exc, (
+        exceptions.ResourceExhausted,    # 429
+        exceptions.InternalServerError,  # 500
+        exceptions.ServiceUnavailable,   # 503
+    ))
+
+# Every Gemini call goes through here: throttled before sending, and retried
+# with jittered backoff when the API answers 429 or a transient 5xx, so a
+# hiccup doesn't cost the user a re-click
+@retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(4),
+    wait=wait_random_exponential(min=1, max=30),
+    reraise=True
+)
+def _generate_content(google_api_key, model, contents, **kwargs):
+    _rate_limiter.acquire()
+    with _genai_for(google_api_key):
+        return model.generate_content(contents, **kwargs)
+
+def stream_gemini_response(context, pdf_content, prompt, outcome):
+    """Yield the response text chunk by chunk as Gemini generates it.
+    
+    outcome["complete"] is set only once the whole response has arrived, so
+    the caller can tell a full answer from an error or a partial stream.
+    """
+    outcome["complete"] = False
+    cache_key = _response_key(context, pdf_content, prompt)
+    if RESPONSE_CACHE_ENABLED:
+        cached = llm_cache.lookup(cache_key)
+        if cached is not None:
+            outcome["complete"] = True
+            yield cached
+            return
+    
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content([context, pdf_content[0], prompt])
-        return response.text
+        chunks = []
+        for chunk in _generate_content(*_gemini_request(context, pdf_content, prompt), stream=True):
+            chunks.append(chunk.text)
+            yield chunk.text
+        if RESPONSE_CACHE_ENABLED:
+            llm_cache.store(cache_key, "".join(chunks))
+        outcome["complete"] = True
     except Exception as e:
         st.error(f"Error generating response: {str(e)}")
-        return f"Error: Unable to process the document. Please check your API key and try again. Error details: {str(e)}"
+        yield f"Error: Unable to process the document. Please check your API key and try again. Error details: {str(e)}"
+
+# Gemini tiles images into 768x768 chunks, so pixels beyond ~2 tiles on the
+# long edge only add upload bytes and billed tokens. 100 DPI keeps body text
+# legible while a letter or A4 page stays within two tiles across, so the
+# cap only bites on oversized pages.
+RENDER_DPI = 100
+MAX_IMAGE_SIDE = 1536
+# WebP is markedly smaller than JPEG for rendered text at the same legibility
+WEBP_QUALITY = 80
+
+# Gemini reads PDFs natively; small one-page documents are uploaded as-is
+# instead of being rasterized
+NATIVE_PDF_MAX_BYTES = 1024 * 1024
+
+# Documents with a real text layer are sent as text: far fewer input tokens
+# than page images. Below this many characters per page the PDF is treated
+# as scanned.
+MIN_TEXT_CHARS_PER_PAGE = 100
+
+# Upper bound on pages read from one document, to keep memory and request
+# size bounded for very large uploads
+MAX_PAGES = int(os.getenv('MAX_PAGES', '500'))
+
+# Scanned pages are sent as images, all in the one request, so the analysis
+# sees more than the cover page. Each costs about a thousand input tokens,
+# hence a much lower cap than for text.
+MAX_IMAGE_PAGES = int(os.getenv('MAX_IMAGE_PAGES', '20'))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _prepare_pdf_parts(pdf_bytes):
+    """Turn a PDF into the Gemini parts describing it, memoized by content."""
+    import fitz  # PyMuPDF; availability is checked by input_pdf_setup
+    import pdf_pages
+    
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        if doc.page_count == 0:
+            return None
+        
+        page_count = min(doc.page_count, MAX_PAGES)
+        # About a millisecond a page, so even MAX_PAGES is extracted here
+        # rather than shipping the PDF to worker processes
+        text = "\n\n".join(pdf_pages.iter_page_text(doc, 0, page_count)).strip()
+        if len(text) >= MIN_TEXT_CHARS_PER_PAGE * page_count:
+            if page_count < doc.page_count:
+                text += f"\n\n[Document truncated: only the first {page_count} of {doc.page_count} pages are included]"
+            return [f"Document text:\n\n{text}"]
+        
+        if doc.page_count == 1 and len(pdf_bytes) < NATIVE_PDF_MAX_BYTES:
+            return [{"mime_type": "application/pdf", "data": pdf_bytes}]
+        
+        image_pages = min(page_count, MAX_IMAGE_PAGES)
+        pdf_parts = [
+            {
+                "mime_type": "image/webp",
+                # Raw bytes: the SDK base64-encodes once when serializing the request
+                "data": pdf_pages.render_page_webp(doc, number, RENDER_DPI, MAX_IMAGE_SIDE, WEBP_QUALITY)
+            }
+            for number in range(image_pages)
+        ]
+        if image_pages < doc.page_count:
+            pdf_parts.append(f"[Document truncated: only the first {image_pages} of {doc.page_count} pages are included]")
+        return pdf_parts
+    finally:
+        doc.close()
+
+def _uploaded_pdf_bytes(uploaded_file):
+    """Return the upload's bytes, read once per file and kept in session state."""
+    if st.session_state.get("_pdf_id") != uploaded_file.file_id:
+        pdf_bytes = uploaded_file.getvalue()
+        st.session_state["_pdf_bytes"] = pdf_bytes
+        st.session_state["_pdf_hash"] = hashlib.sha256(pdf_bytes).hexdigest()[:16]
+        st.session_state["_pdf_id"] = uploaded_file.file_id
+    return st.session_state["_pdf_bytes"]
+
+def _uploaded_pdf_hash(uploaded_file):
+    """Return a short content hash of the upload, computed once per file."""
+    _uploaded_pdf_bytes(uploaded_file)
+    return st.session_state["_pdf_hash"]
 
 def input_pdf_setup(uploaded_file):
     if uploaded_file is not None:
+        _import_fitz()
         try:
-            # Reset file pointer to beginning
-            uploaded_file.seek(0)
+            pdf_bytes = _uploaded_pdf_bytes(uploaded_file)
             
-            # Convert PDF to images with better error handling
+            # Preparation is cached on the file bytes, so repeat analyses of
+            # the same document skip PyMuPDF entirely
             try:
-                # Try to convert PDF to images
-                images = pdf2image.convert_from_bytes(uploaded_file.read())
-            except Exception as pdf_error:
+                pdf_parts = _prepare_pdf_parts(pdf_bytes)
+            except RuntimeError as pdf_error:
                 st.error(f"PDF processing error: {str(pdf_error)}")
                 st.info("""
                 **Troubleshooting Steps:**
                 1. Ensure the PDF file is not corrupted
                 2. Try with a different PDF file
-                3. Check if poppler-utils is properly installed
-                4. For Streamlit Cloud, ensure packages.txt contains 'poppler-utils'
+                3. Check that the file is a valid, unencrypted PDF
                 """)
                 return None
             
-            if not images:
+            if pdf_parts is None:
                 st.warning("No pages found in the PDF. Please check if the PDF file is valid.")
                 return None
-                
-            first_page = images[0]
-            img_byte_arr = io.BytesIO()
-            first_page.save(img_byte_arr, format='JPEG')
-            img_byte_arr = img_byte_arr.getvalue()
             
-            pdf_parts = [
-                {
-                    "mime_type": "image/jpeg",
-                    "data": base64.b64encode(img_byte_arr).decode()
-                }
-            ]
             return pdf_parts
         except Exception as e:
             st.error(f"Unexpected error processing PDF: {str(e)}")
@@ -140,17 +424,17 @@ def input_pdf_setup(uploaded_file):
     else:
         raise FileNotFoundError("No file uploaded")
 
-# Main App UI
-st.markdown('<h1 style="text-align: center;">💼 IT Consulting Assistant</h1>', unsafe_allow_html=True)
-
-# Introduction Card
-create_card(
-    "Welcome to IT Consulting Assistant",
-    "This AI-powered system helps IT consultants analyze BRD, CRD, and technical documents with precision and efficiency. Upload your documents and get comprehensive insights, technology recommendations, project feasibility analysis, and stakeholder communication tools to accelerate your consulting projects."
+# Main App UI: title, introduction card and separator in one element
+st.markdown(
+    '<h1 style="text-align: center;">💼 IT Consulting Assistant</h1>'
+    + card_html(
+        "Welcome to IT Consulting Assistant",
+        "This AI-powered system helps IT consultants analyze BRD, CRD, and technical documents with precision and efficiency. Upload your documents and get comprehensive insights, technology recommendations, project feasibility analysis, and stakeholder communication tools to accelerate your consulting projects."
+    )
+    + "<hr>",
+    unsafe_allow_html=True
 )
 
-st.markdown("---")
-
 # How to Use Section
 with st.expander("How to Use This System", expanded=True):
     st.markdown("""
@@ -179,17 +463,18 @@ with st.expander("How to Use This System", expanded=True):
 col1, col2 = st.columns(2)
 
 with col1:
-    st.markdown('<div class="css-card">', unsafe_allow_html=True)
     st.subheader("Document Upload")
     uploaded_file = st.file_uploader("Upload Document (PDF)...", type=["pdf"])
     if uploaded_file is not None:
         st.success("PDF Uploaded Successfully")
     else:
         st.info("Please upload a PDF document to begin analysis")
-    st.markdown('</div>', unsafe_allow_html=True)
+        # Release the previous document's bytes once the uploader is cleared
+        st.session_state.pop("_pdf_bytes", None)
+        st.session_state.pop("_pdf_hash", None)
+        st.session_state.pop("_pdf_id", None)
 
 with col2:
-    st.markdown('<div class="css-card">', unsafe_allow_html=True)
     st.subheader("Analysis Options")
     analysis_context = st.text_area(
         "Additional Context or Focus Areas (Optional)",
@@ -197,837 +482,357 @@ with col2:
         help="This context will help guide the analysis of your document"
     )
 
-st.markdown("---")
-
-# Analysis Options Section
-st.subheader("Choose Analysis Type")
-st.markdown('<div class="analysis-options">', unsafe_allow_html=True)
-
-# Create three columns for better button layout
-btn_col1, btn_col2, btn_col3 = st.columns(3)
+class Analysis(NamedTuple):
+    key: str
+    button: str
+    title: str
+    spinner: str
+    prompt: str
+    upload_hint: str = "Please upload a document first"
+    # Shown under "Project Planning & Communication" as a primary button
+    planning: bool = False
+
+# Every analysis, in display order; drives the single-analysis buttons and
+# the "Run Selected Analyses" form
+ALL_ANALYSES = [
+    Analysis("brd", "BRD Analysis", "BRD Analysis & Business Requirements", "Analyzing BRD document...",
+             BRD_PROMPT, "Please upload a BRD document first"),
+    Analysis("crd", "CRD Analysis", "CRD Analysis & Solution Mapping", "Analyzing CRD document...",
+             CRD_PROMPT, "Please upload a CRD document first"),
+    Analysis("technical", "Technical Document Analysis", "Technical Document Analysis",
+             "Analyzing technical document...", TECHNICAL_PROMPT, "Please upload a technical document first"),
+    Analysis("pre_execution", "Pre-Execution Questions", "Pre-Execution Questions & Clarifications",
+             "Identifying pre-execution questions...", PRE_EXECUTION_PROMPT),
+    Analysis("feasibility", "Project Feasibility", "Project Feasibility Analysis",
+             "Assessing project feasibility...", FEASIBILITY_PROMPT),
+    Analysis("architecture", "Architecture Recommendations", "Architecture & Technology Recommendations",
+             "Generating architecture recommendations...", ARCHITECTURE_PROMPT),
+    Analysis("roadmap", "Implementation Roadmap", "Implementation Roadmap & Project Planning",
+             "Creating implementation roadmap...", ROADMAP_PROMPT, planning=True),
+    Analysis("email", "Generate Stakeholder Email", "Stakeholder Email Summary",
+             "Generating stakeholder email...", EMAIL_PROMPT, planning=True),
+]
+ANALYSES_BY_KEY = {analysis.key: analysis for analysis in ALL_ANALYSES}
+
+# Buttons record what they asked for in session state from their on_click
+# callback; the script then pops it once instead of checking every button
+def _request_action(action):
+    st.session_state["action"] = action
+
+# Responses generated this session, keyed by (document hash, context,
+# analysis key), so a rerun triggered by another widget redraws them instead
+# of asking Gemini again
+def _session_responses():
+    return st.session_state.setdefault("_responses", {})
+
+def _clear_session_responses():
+    st.session_state.pop("_responses", None)
+    st.session_state.pop("_last_action", None)
 
-with btn_col1:
-    submit1 = st.button("BRD Analysis", use_container_width=True)
-    submit2 = st.button("CRD Analysis", use_container_width=True)
 
-with btn_col2:
-    submit3 = st.button("Technical Document Analysis", use_container_width=True)
-    submit4 = st.button("Pre-Execution Questions", use_container_width=True)
-
-with btn_col3:
-    submit5 = st.button("Project Feasibility", use_container_width=True)
-    submit6 = st.button("Architecture Recommendations", use_container_width=True)
+# Analysis Options Section
+section_header("Choose Analysis Type")
 
-st.markdown('</div>', unsafe_allow_html=True)
+# Three columns of analysis buttons, filled top to bottom
+analysis_buttons = [analysis for analysis in ALL_ANALYSES if not analysis.planning]
+btn_cols = st.columns(3)
+per_col = -(-len(analysis_buttons) // len(btn_cols))
+for i, analysis in enumerate(analysis_buttons):
+    btn_cols[i // per_col].button(analysis.button, use_container_width=True,
+                                  on_click=_request_action, args=(analysis.key,))
 
 # Add new section for Implementation Roadmap
-st.markdown("---")
-st.subheader("Project Planning & Communication")
-st.markdown('<div class="analysis-options">', unsafe_allow_html=True)
+section_header("Project Planning & Communication")
 
 # Create a dedicated section for project planning
-planning_col1, planning_col2 = st.columns(2)
-
-with planning_col1:
-    submit_roadmap = st.button("Implementation Roadmap", use_container_width=True, type="primary")
-
-with planning_col2:
-    submit_email = st.button("Generate Stakeholder Email", use_container_width=True, type="primary")
-
-st.markdown('</div>', unsafe_allow_html=True)
+planning_buttons = [analysis for analysis in ALL_ANALYSES if analysis.planning]
+for column, analysis in zip(st.columns(len(planning_buttons)), planning_buttons):
+    column.button(analysis.button, use_container_width=True, type="primary",
+                  on_click=_request_action, args=(analysis.key,))
+
+# Widgets inside a form don't rerun the script when changed, so ticking
+# analyses on and off costs nothing until the form is submitted
+with st.form("run_analyses_form"):
+    st.markdown("##### Run Several Analyses")
+    pick_cols = st.columns(2)
+    picks = {}
+    for i, analysis in enumerate(ALL_ANALYSES):
+        picks[analysis.key] = pick_cols[i % 2].checkbox(analysis.title, value=True, key=f"pick_{analysis.key}")
+    batch_all = st.checkbox(
+        "Combine the selected analyses into a single request",
+        help="Sends the document to Gemini once for every selected analysis. Cheaper in input tokens, but results arrive together at the end instead of in parallel."
+    )
+    st.form_submit_button("Run Selected Analyses", use_container_width=True,
+                          on_click=_request_action, args=("selected",))
+selected_analyses = [analysis for analysis in ALL_ANALYSES if picks[analysis.key]]
+st.button(
+    "Clear Session Results",
+    on_click=_clear_session_responses,
+    help="Forget the analyses generated in this session and clear them from the page."
+)
 
 # Results Section
-st.markdown("---")
-st.subheader("Analysis Results")
-
-# Email generation prompt
-input_prompt_email = """
-You are an IT Consulting Professional preparing a summary email for stakeholders about project understanding and next steps. Create a professional email that includes:
-
-SUBJECT: IT Project Analysis Summary - [Document Type] Review
-
-Dear [Stakeholder Name],
-
-I hope this email finds you well. I have completed the initial analysis of the [Document Type] and would like to provide you with a comprehensive understanding of the project scope and our recommended next steps.
-
-## Project Understanding Summary:
-[Provide a 3-4 line summary of the project scope, objectives, and key deliverables based on the document analysis]
-
-## Key Findings & Recommendations:
-[Present the main technical findings, architecture recommendations, and strategic insights in bullet points]
-
-## Critical Questions Requiring Your Input:
-[Create a table with the following columns]
-| Priority | Question/Clarification Needed | Impact | Recommended Action |
-|----------|------------------------------|--------|-------------------|
-[Fill with identified gaps and questions that need stakeholder clarification]
-
-## Technical Feasibility Assessment:
-- **Overall Feasibility:** [High/Medium/Low]
-- **Key Technical Challenges:** [List main technical hurdles]
-- **Resource Requirements:** [Skills, team size, timeline estimates]
-- **Risk Factors:** [Technical and business risks identified]
-
-## Recommended Implementation Approach:
-[Outline the proposed methodology, technology stack, and implementation phases]
-
-## Next Steps & Timeline:
-[Provide a clear action plan with specific deliverables and timelines]
-
-## Questions for Your Review:
-1. [Specific question about requirements or constraints]
-2. [Question about budget or timeline preferences]
-3. [Question about stakeholder availability or decision-making process]
-
-Please review the attached detailed analysis and provide your feedback on the above points, particularly regarding [mention 1-2 specific critical decisions needed].
-
-I am available for a detailed discussion at your convenience to address any questions or concerns.
-
-Best regards,
-[Your Name]
-IT Consulting Team
-
-Note: Please find the detailed technical analysis and recommendations attached to this email.
-
-Format this email professionally and ensure all critical information is clearly presented for stakeholder decision-making.
-"""
-
-# Analysis prompts
-input_prompt1 = """
-You are a Senior IT Consultant specializing in Business Requirements Document (BRD) analysis. Analyze this BRD document and provide comprehensive insights for IT consulting projects.
-
-Please provide a detailed analysis in the following structure:
-
-## 1. BRD Overview & Business Context
-- Document type and business domain
-- Primary business objectives and goals
-- Key stakeholders and end users
-- Current pain points or business challenges
-- Expected business outcomes and success metrics
-
-## 2. Business Process Analysis
-- Identify all major business processes from the BRD
-- Map current vs. desired state for each process
-- Highlight automation and optimization opportunities
-- Identify integration points between processes
-- Document process dependencies and workflows
-
-## 3. Functional Requirements Analysis
-- Core functional requirements breakdown
-- User stories and use cases identification
-- Business rules and constraints
-- Data requirements and flows
-- Reporting and analytics needs
-
-## 4. Non-Functional Requirements
-- Performance requirements
-- Security and compliance needs
-- Scalability considerations
-- Usability and accessibility requirements
-- Integration requirements
-
-## 5. Technology Implications
-- Current technology landscape assessment
-- Technology gaps and opportunities
-- Recommended technology stack considerations
-- Integration requirements with existing systems
-- Data migration and conversion needs
-
-## 6. Risk Assessment
-- Technical risks and challenges
-- Business risks and dependencies
-- Resource and timeline risks
-- Compliance and regulatory risks
-- Mitigation strategies
-
-## 7. Recommendations & Next Steps
-- Priority implementation recommendations
-- Phased approach suggestions
-- Resource requirements estimation
-- Timeline recommendations
-- Success criteria and KPIs
-
-Present your analysis in a structured format with clear sections, bullet points, and actionable recommendations for IT consulting projects.
-"""
-
-input_prompt2 = """
-You are a Senior IT Consultant specializing in Customer Requirements Document (CRD) analysis. Analyze this CRD document and provide comprehensive solution mapping and gap analysis for IT consulting projects.
-
-Please provide a detailed analysis in the following structure:
-
-## 1. CRD Overview & Customer Context
-- Document type and customer domain
-- Primary customer objectives and pain points
-- Key customer stakeholders and decision makers
-- Current customer challenges and limitations
-- Expected customer outcomes and value proposition
-
-## 2. Customer Requirements Analysis
-- Functional requirements breakdown
-- Non-functional requirements assessment
-- User experience requirements
-- Integration requirements with customer systems
-- Data and reporting requirements
-
-## 3. Solution Mapping
-- Current customer solution assessment
-- Gap analysis between current and desired state
-- Solution architecture recommendations
-- Technology stack alignment with customer needs
-- Integration strategy with existing customer systems
-
-## 4. Customer Journey & User Experience
-- End-user journey mapping
-- User interface and experience requirements
-- Accessibility and usability considerations
-- Training and support requirements
-- Change management considerations
-
-## 5. Technical Feasibility Assessment
-- Technical complexity evaluation
-- Resource requirements estimation
-- Timeline feasibility assessment
-- Risk factors and mitigation strategies
-- Scalability and performance considerations
-
-## 6. Business Value Proposition
-- ROI analysis and business case
-- Cost-benefit analysis
-- Competitive advantages
-- Market positioning
-- Success metrics and KPIs
-
-## 7. Implementation Strategy
-- Phased implementation approach
-- Resource allocation recommendations
-- Timeline and milestone planning
-- Risk management strategies
-- Quality assurance and testing approach
-
-Present your analysis with clear recommendations for IT consulting projects, focusing on customer value and successful solution delivery.
-"""
-
-input_prompt3 = """
-You are a Senior Technical Architect and IT Consultant specializing in technical document analysis. Analyze this technical document and provide comprehensive technical insights and recommendations.
-
-Please provide a detailed analysis in the following structure:
-
-## 1. Technical Document Overview
-- Document type and technical domain
-- Primary technical objectives
-- Target audience and stakeholders
-- Current technical challenges
-- Expected technical outcomes
-
-## 2. Technical Architecture Analysis
-- Current architecture assessment
-- Architecture patterns and design principles
-- Technology stack evaluation
-- Scalability and performance considerations
-- Security and compliance requirements
-
-## 3. System Design & Components
-- System components and modules
-- Data flow and integration points
-- API design and specifications
-- Database design and data modeling
-- Infrastructure requirements
-
-## 4. Technical Requirements Analysis
-- Functional technical requirements
-- Non-functional technical requirements
-- Performance and scalability requirements
-- Security and compliance requirements
-- Integration and interoperability requirements
-
-## 5. Technology Stack Recommendations
-- Programming languages and frameworks
-- Database and storage solutions
-- Cloud platform recommendations
-- DevOps and CI/CD tools
-- Monitoring and logging solutions
-
-## 6. Technical Risk Assessment
-- Technical complexity risks
-- Performance and scalability risks
-- Security and compliance risks
-- Integration and compatibility risks
-- Resource and skill requirements
-
-## 7. Implementation Recommendations
-- Development methodology recommendations
-- Technical implementation phases
-- Resource and skill requirements
-- Timeline and milestone planning
-- Quality assurance and testing strategy
-
-Present your analysis with technical depth and practical recommendations for IT consulting projects.
-"""
-
-input_prompt4 = """
-You are a Senior IT Project Manager and Business Analyst specializing in pre-execution project analysis. Analyze this document and identify critical questions, gaps, and clarifications needed before project execution.
-
-Please provide a comprehensive analysis in the following structure:
-
-## 1. Project Scope Analysis
-- Current scope understanding
-- Scope gaps and ambiguities
-- Missing requirements identification
-- Scope creep risk assessment
-- Scope validation questions
-
-## 2. Stakeholder Analysis & Communication
-- Key stakeholder identification
-- Stakeholder expectations alignment
-- Communication plan requirements
-- Decision-making process clarification
-- Stakeholder availability and commitment
-
-## 3. Technical Questions & Clarifications
-- Technical architecture decisions needed
-- Technology stack selection criteria
-- Integration requirements clarification
-- Performance and scalability requirements
-- Security and compliance requirements
-
-## 4. Resource & Timeline Questions
-- Team composition and skill requirements
-- Resource availability and allocation
-- Timeline feasibility and constraints
-- Budget allocation and approval process
-- External dependencies and vendors
-
-## 5. Risk & Compliance Questions
-- Technical risk mitigation strategies
-- Business risk assessment
-- Compliance and regulatory requirements
-- Legal and contractual considerations
-- Insurance and liability coverage
-
-## 6. Success Criteria & KPIs
-- Project success definition
-- Key performance indicators
-- Quality assurance criteria
-- User acceptance criteria
-- Go-live and deployment criteria
-
-## 7. Critical Questions Matrix
-Create a detailed table with the following columns:
-| Priority | Category | Question/Clarification | Impact | Owner | Timeline |
-|----------|----------|------------------------|--------|-------|----------|
-[Fill with specific questions that need stakeholder input]
-
-## 8. Recommended Next Steps
-- Immediate actions required
-- Stakeholder meetings needed
-- Documentation requirements
-- Approval processes
-- Timeline for clarifications
-
-Present your analysis with clear, actionable questions that will help ensure project success and stakeholder alignment.
-"""
-
-input_prompt5 = """
-You are a Senior IT Project Manager and Technical Architect specializing in project feasibility analysis. Analyze this document and provide comprehensive feasibility assessment for IT consulting projects.
-
-Please provide a detailed analysis in the following structure:
-
-## 1. Technical Feasibility Assessment
-- **Overall Technical Feasibility:** [High/Medium/Low]
-- Technology maturity and availability
-- Technical complexity evaluation
-- Integration feasibility with existing systems
-- Performance and scalability considerations
-- Security and compliance requirements
-
-## 2. Resource Feasibility Analysis
-- **Team Requirements:**
-  - Required skills and expertise
-  - Team size and composition
-  - Availability and allocation
-  - Training and knowledge transfer needs
-- **Infrastructure Requirements:**
-  - Hardware and software needs
-  - Cloud platform requirements
-  - Development and testing environments
-  - Production deployment requirements
-
-## 3. Timeline Feasibility Assessment
-- **Project Timeline Analysis:**
-  - Estimated project duration
-  - Critical path identification
-  - Milestone planning
-  - Dependencies and constraints
-- **Risk Factors:**
-  - Timeline risks and mitigation
-  - Resource availability risks
-  - Technical complexity risks
-  - External dependency risks
-
-## 4. Budget & Cost Feasibility
-- **Cost Breakdown:**
-  - Development costs
-  - Infrastructure costs
-  - Licensing and third-party costs
-  - Maintenance and support costs
-- **ROI Analysis:**
-  - Expected benefits
-  - Cost-benefit analysis
-  - Payback period
-  - Risk-adjusted returns
-
-## 5. Business Feasibility
-- **Business Case Validation:**
-  - Alignment with business objectives
-  - Stakeholder buy-in assessment
-  - Market and competitive analysis
-  - Regulatory and compliance requirements
-- **Change Management:**
-  - Organizational readiness
-  - User adoption considerations
-  - Training and support requirements
-  - Resistance and mitigation strategies
-
-## 6. Risk Assessment & Mitigation
-- **Technical Risks:**
-  - Technology risks and mitigation
-  - Integration risks and strategies
-  - Performance and scalability risks
-  - Security and compliance risks
-- **Business Risks:**
-  - Market and competitive risks
-  - Resource and timeline risks
-  - Stakeholder and change management risks
-  - Financial and budget risks
-
-## 7. Feasibility Recommendations
-- **Go/No-Go Decision Factors:**
-  - Critical success factors
-  - Deal-breaker conditions
-  - Risk tolerance assessment
-  - Alternative approaches
-- **Implementation Strategy:**
-  - Recommended approach
-  - Phased implementation plan
-  - Risk mitigation strategies
-  - Success monitoring plan
-
-Present your analysis with clear feasibility indicators, risk assessments, and actionable recommendations for project decision-making.
-"""
-
-input_prompt6 = """
-You are a Senior Technical Architect and IT Consultant specializing in architecture and technology stack recommendations. Analyze this document and provide comprehensive architecture and technology recommendations.
-
-Please provide a detailed analysis in the following structure:
-
-## 1. Architecture Assessment & Recommendations
-- **Current Architecture Analysis:**
-  - Existing system architecture
-  - Architecture patterns evaluation
-  - Scalability and performance assessment
-  - Integration complexity analysis
-- **Recommended Architecture:**
-  - Architecture pattern selection
-  - Component design recommendations
-  - Data flow and integration design
-  - Security architecture considerations
-
-## 2. Technology Stack Recommendations
-- **Frontend Technologies:**
-  - Framework recommendations (React, Angular, Vue, etc.)
-  - UI/UX libraries and tools
-  - Mobile and responsive considerations
-  - Performance optimization tools
-- **Backend Technologies:**
-  - Programming languages (Java, Python, Node.js, etc.)
-  - Framework recommendations
-  - API design and management
-  - Microservices considerations
-- **Database & Storage:**
-  - Database type recommendations (SQL, NoSQL, etc.)
-  - Specific database technologies
-  - Data modeling considerations
-  - Backup and recovery strategies
-
-## 3. Cloud & Infrastructure Recommendations
-- **Cloud Platform:**
-  - Platform recommendations (AWS, Azure, GCP)
-  - Service selection and optimization
-  - Cost optimization strategies
-  - Multi-cloud considerations
-- **Infrastructure as Code:**
-  - IaC tools and practices
-  - Containerization strategies
-  - Orchestration platforms
-  - Monitoring and logging solutions
-
-## 4. Integration & API Strategy
-- **Integration Architecture:**
-  - API design patterns
-  - Integration middleware recommendations
-  - Data transformation and mapping
-  - Real-time vs. batch processing
-- **Third-Party Integrations:**
-  - Recommended third-party services
-  - API management and governance
-  - Security and authentication
-  - Rate limiting and throttling
-
-## 5. Security & Compliance Architecture
-- **Security Framework:**
-  - Authentication and authorization
-  - Data encryption and protection
-  - Network security considerations
-  - Compliance requirements (GDPR, HIPAA, etc.)
-- **DevSecOps Integration:**
-  - Security scanning and testing
-  - Vulnerability management
-  - Compliance monitoring
-  - Incident response planning
-
-## 6. Performance & Scalability Architecture
-- **Performance Optimization:**
-  - Caching strategies
-  - Load balancing recommendations
-  - Database optimization
-  - CDN and content delivery
-- **Scalability Planning:**
-  - Horizontal vs. vertical scaling
-  - Auto-scaling strategies
-  - Performance monitoring
-  - Capacity planning
-
-## 7. Implementation Roadmap
-- **Technology Adoption Strategy:**
-  - Phased implementation approach
-  - Technology migration planning
-  - Risk mitigation strategies
-  - Success criteria and KPIs
-- **Resource Planning:**
-  - Skill requirements and training
-  - Team composition recommendations
-  - Vendor and partner selection
-  - Timeline and milestone planning
-
-Present your analysis with specific technology recommendations, architecture diagrams where applicable, and implementation guidance for successful project delivery.
-"""
-
-input_prompt_roadmap = """
-You are a Senior IT Project Manager and Technical Architect specializing in implementation roadmap development. Analyze this document and provide a comprehensive implementation roadmap with detailed project planning and risk assessment.
-
-Please provide a detailed analysis in the following structure:
-
-## 1. Project Overview & Scope
-- **Project Summary:**
-  - Project objectives and goals
-  - Scope boundaries and deliverables
-  - Key stakeholders and decision makers
-  - Success criteria and KPIs
-- **Business Case:**
-  - ROI analysis and business value
-  - Cost-benefit justification
-  - Risk-adjusted returns
-  - Strategic alignment
-
-## 2. Implementation Strategy
-- **Approach Selection:**
-  - Waterfall vs. Agile vs. Hybrid approach
-  - Phased implementation strategy
-  - Parallel vs. sequential execution
-  - Risk mitigation approach
-- **Methodology:**
-  - Development methodology (Scrum, Kanban, etc.)
-  - Quality assurance approach
-  - Testing strategy (Unit, Integration, UAT)
-  - Deployment strategy
-
-## 3. Detailed Implementation Roadmap
-
-### Phase 1: Foundation & Setup (Weeks 1-4)
-- **Activities:**
-  - Project team formation and setup
-  - Infrastructure and environment setup
-  - Tool selection and configuration
-  - Initial architecture design
-- **Deliverables:**
-  - Project charter and governance
-  - Technical architecture document
-  - Development environment setup
-  - Team training and onboarding
-- **Timeline:** 4 weeks
-- **Resources:** [List required resources]
-- **Risks:** [Identify risks and mitigation]
-
-### Phase 2: Core Development (Weeks 5-16)
-- **Activities:**
-  - Core system development
-  - Database design and implementation
-  - API development and integration
-  - User interface development
-- **Deliverables:**
-  - Core system modules
-  - Database schema and data
-  - API documentation
-  - UI/UX components
-- **Timeline:** 12 weeks
-- **Resources:** [List required resources]
-- **Risks:** [Identify risks and mitigation]
-
-### Phase 3: Integration & Testing (Weeks 17-20)
-- **Activities:**
-  - System integration
-  - Comprehensive testing
-  - Performance optimization
-  - Security testing
-- **Deliverables:**
-  - Integrated system
-  - Test results and reports
-  - Performance benchmarks
-  - Security assessment
-- **Timeline:** 4 weeks
-- **Resources:** [List required resources]
-- **Risks:** [Identify risks and mitigation]
-
-### Phase 4: Deployment & Go-Live (Weeks 21-24)
-- **Activities:**
-  - Production deployment
-  - User acceptance testing
-  - Training and documentation
-  - Go-live support
-- **Deliverables:**
-  - Production system
-  - User training materials
-  - System documentation
-  - Support procedures
-- **Timeline:** 4 weeks
-- **Resources:** [List required resources]
-- **Risks:** [Identify risks and mitigation]
-
-## 4. Resource Planning & Allocation
-- **Team Structure:**
-  - Project Manager
-  - Technical Lead/Architect
-  - Developers (Frontend/Backend)
-  - QA Engineers
-  - DevOps Engineers
-  - Business Analysts
-- **Skill Requirements:**
-  - Technical skills and expertise
-  - Domain knowledge requirements
-  - Training and certification needs
-  - External consultant requirements
-- **Resource Timeline:**
-  - Resource allocation by phase
-  - Ramp-up and ramp-down planning
-  - Backup and contingency planning
-
-## 5. Risk Assessment & Mitigation
-- **Technical Risks:**
-  - Technology complexity risks
-  - Integration challenges
-  - Performance and scalability issues
-  - Security vulnerabilities
-- **Project Risks:**
-  - Timeline and scope risks
-  - Resource availability risks
-  - Stakeholder alignment risks
-  - Budget and cost risks
-- **Mitigation Strategies:**
-  - Risk prevention measures
-  - Contingency planning
-  - Escalation procedures
-  - Regular risk reviews
-
-## 6. Quality Assurance & Testing
-- **Testing Strategy:**
-  - Unit testing approach
-  - Integration testing plan
-  - User acceptance testing
-  - Performance testing
-- **Quality Gates:**
-  - Definition of Done criteria
-  - Quality checkpoints
-  - Review and approval processes
-  - Go-live readiness criteria
-
-## 7. Communication & Stakeholder Management
-- **Communication Plan:**
-  - Stakeholder communication matrix
-  - Reporting frequency and format
-  - Escalation procedures
-  - Change management approach
-- **Stakeholder Engagement:**
-  - Key stakeholder identification
-  - Engagement strategies
-  - Decision-making processes
-  - Conflict resolution procedures
-
-## 8. Budget & Cost Management
-- **Cost Breakdown:**
-  - Development costs
-  - Infrastructure costs
-  - Licensing and third-party costs
-  - Training and support costs
-- **Budget Management:**
-  - Cost tracking and monitoring
-  - Change request procedures
-  - Budget approval processes
-  - Cost optimization strategies
-
-## 9. Success Metrics & KPIs
-- **Project Success Metrics:**
-  - Timeline adherence
-  - Budget compliance
-  - Quality metrics
-  - Stakeholder satisfaction
-- **Business Success Metrics:**
-  - ROI achievement
-  - Business value delivery
-  - User adoption rates
-  - Performance improvements
-
-## 10. Post-Implementation Support
-- **Support Strategy:**
-  - Warranty period support
-  - Ongoing maintenance
-  - Enhancement planning
-  - Knowledge transfer
-- **Continuous Improvement:**
-  - Lessons learned documentation
-  - Process improvements
-  - Technology updates
-  - Future roadmap planning
-
-Present your roadmap with clear timelines, resource requirements, risk assessments, and actionable next steps for successful project execution.
-"""
-
-# Add the email generation logic after the existing button handlers
-if submit_email:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Generating stakeholder email..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt_email)
-            st.subheader("Stakeholder Email Summary")
-            st.markdown("---")
-            st.markdown(response)
-            
-            # Add a copy button for the email
-            st.markdown("---")
-            st.markdown("##### Copy Email to Clipboard")
-            if st.button("Copy Email"):
-                st.code(response)
-                st.success("Email content copied to clipboard!")
-        else:
-            st.error("Failed to process the PDF. Please try uploading a different file.")
-    else:
-        st.write("Please upload a document first")
-
-if submit1:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Analyzing BRD document..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt1)
-            st.subheader("BRD Analysis & Business Requirements")
-            st.markdown("---")
-            st.markdown(response)
-        else:
-            st.error("Failed to process the PDF. Please try uploading a different file.")
-    else:
-        st.write("Please upload a BRD document first")
+section_header("Analysis Results")
+
+# Drawn from the session's stored response, outside the generation path, so
+# the controls work on any later rerun without generating again. A fragment:
+# its buttons rerun only this function, so using them doesn't rerun the
+# script and resend the whole analysis above to the browser
+@st.fragment
+def _render_result_actions(analysis, response):
+    if analysis.key == "email":
+        st.markdown("---")
+        st.download_button(
+            label="Download Email",
+            data=response,
+            file_name="stakeholder_email.txt",
+            mime="text/plain"
+        )
+        # st.code carries its own copy-to-clipboard icon; collapsed, since
+        # the email is already rendered above
+        with st.expander("Copy Email to Clipboard"):
+            st.code(response, language=None)
+    elif analysis.key == "roadmap":
+        # Add download option for the roadmap
+        st.markdown("---\n\n##### Download Implementation Roadmap")
+        st.download_button(
+            label="Download as Text",
+            data=response,
+            file_name="implementation_roadmap.txt",
+            mime="text/plain"
+        )
 
-elif submit2:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Analyzing CRD document..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt2)
-            st.subheader("CRD Analysis & Solution Mapping")
-            st.markdown("---")
-            st.markdown(response)
+def _render_analysis(analysis, response):
+    render_result(analysis.title, response)
+    _render_result_actions(analysis, response)
+
+# One pool for the whole process: it bounds concurrent Gemini calls across
+# every session, and work submitted to it keeps the script thread free to
+# update the page (and to be interrupted by a rerun) while requests run
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    return ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+
+# Stores a background request's text in the response cache from the worker
+# thread as soon as it finishes. A rerun can interrupt the script while it
+# waits on the future; the paid-for response is kept either way.
+def _cache_when_done(future, cache_key, is_valid=None):
+    def store(done):
+        if done.cancelled() or done.exception() is not None:
+            return
+        try:
+            text = done.result().text
+        except Exception:
+            # e.g. a blocked response with no text; nothing to cache
+            return
+        if is_valid is None or is_valid(text):
+            llm_cache.store(cache_key, text)
+    if RESPONSE_CACHE_ENABLED:
+        future.add_done_callback(store)
+
+# Gemini calls are network-bound, so running them on threads overlaps the
+# latencies instead of paying them back to back
+def _run_all_concurrently(context, pdf_content, analyses):
+    """Run the analyses and return the successful responses by key."""
+    # Resolve models on the script thread; worker threads have no
+    # Streamlit context and only perform the HTTP calls
+    progress = st.progress(0.0)
+    tabs = st.tabs([analysis.title for analysis in analyses])
+    results = {}
+    pending = []
+    for tab, analysis in zip(tabs, analyses):
+        slot = tab.empty()
+        cache_key = _response_key(context, pdf_content, analysis.prompt)
+        cached = llm_cache.lookup(cache_key) if RESPONSE_CACHE_ENABLED else None
+        if cached is not None:
+            results[analysis.key] = cached
+            slot.markdown(cached)
         else:
-            st.error("Failed to process the PDF. Please try uploading a different file.")
-    else:
-        st.write("Please upload a CRD document first")
-
-elif submit3:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Analyzing technical document..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt3)
-            st.subheader("Technical Document Analysis")
-            st.markdown("---")
-            st.markdown(response)
+            slot.info(analysis.spinner)
+            pending.append((analysis.key, slot, cache_key, _gemini_request(context, pdf_content, analysis.prompt)))
+    
+    done = len(analyses) - len(pending)
+    progress.progress(done / len(analyses), text=f"{done} of {len(analyses)} analyses complete")
+    executor = get_executor()
+    futures = {}
+    for key, slot, cache_key, request in pending:
+        future = executor.submit(_generate_content, *request)
+        _cache_when_done(future, cache_key)
+        futures[future] = (key, slot)
+    # Each tab is filled in as soon as its own request finishes
+    for future in as_completed(futures):
+        key, slot = futures[future]
+        try:
+            response = future.result().text
+        except Exception as e:
+            slot.error(f"Error generating response: {str(e)}")
         else:
-            st.error("Failed to process the PDF. Please try uploading a different file.")
-    else:
-        st.write("Please upload a technical document first")
-
-elif submit4:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Identifying pre-execution questions..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt4)
-            st.subheader("Pre-Execution Questions & Clarifications")
-            st.markdown("---")
-            st.markdown(response)
+            results[key] = response
+            slot.markdown(response)
+        done += 1
+        progress.progress(done / len(analyses), text=f"{done} of {len(analyses)} analyses complete")
+    return results
+
+# One JSON-mode request for every analysis: the document's input tokens are
+# paid once instead of once per analysis, at the cost of a longer single call
+BATCH_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+def _run_all_batched(context, pdf_content, analyses):
+    """Run the analyses in one request and return the responses by key."""
+    prompt = build_batch_prompt([(analysis.key, analysis.prompt) for analysis in analyses])
+    cache_key = _response_key(context, pdf_content, prompt, BATCH_GENERATION_CONFIG)
+    raw = llm_cache.lookup(cache_key) if RESPONSE_CACHE_ENABLED else None
+    from_cache = raw is not None
+    truncated = False
+    if not from_cache:
+        future = get_executor().submit(
+            _generate_content,
+            *_gemini_request(context, pdf_content, prompt),
+            generation_config=BATCH_GENERATION_CONFIG
+        )
+        # Validated before caching, so a malformed reply isn't replayed from
+        # the cache on every later click
+        _cache_when_done(future, cache_key, lambda text: _parse_batch_response(text, analyses) is not None)
+        label = f"Running {len(analyses)} analyses in a single request..."
+        with st.status(label) as status:
+            started = time.monotonic()
+            # Blocks on the future itself, waking once a second to tick the
+            # elapsed time, rather than polling it
+            while not wait([future], timeout=1).done:
+                status.update(label=f"{label} ({time.monotonic() - started:.0f}s)")
+            try:
+                response = future.result()
+                raw = response.text
+            except Exception as e:
+                status.update(label="Combined request failed", state="error")
+                st.error(f"Error generating response: {str(e)}")
+                return {}
+            truncated = _hit_token_limit(response)
+            status.update(label="All analyses complete", state="complete")
+    
+    results = _parse_batch_response(raw, analyses)
+    if results is None:
+        if truncated:
+            st.error("The combined response was cut off at the model's output-token limit. Select fewer analyses to combine, or run them as separate requests.")
         else:
-            st.error("Failed to process the PDF. Please try uploading a different file.")
-    else:
-        st.write("Please upload a document first")
+            st.error("The combined response was not valid JSON. Please try again, or run the analyses as separate requests.")
+        return {}
+    
+    _render_result_tabs(results, analyses)
+    return results
 
-elif submit5:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Assessing project feasibility..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt5)
-            st.subheader("Project Feasibility Analysis")
-            st.markdown("---")
-            st.markdown(response)
-        else:
-            st.error("Failed to process the PDF. Please try uploading a different file.")
-    else:
-        st.write("Please upload a document first")
+def _hit_token_limit(response):
+    """Whether generation stopped at max output tokens rather than finishing."""
+    try:
+        reason = response.candidates[0].finish_reason
+    except (AttributeError, IndexError):
+        return False
+    return getattr(reason, "name", reason) == "MAX_TOKENS"
 
-elif submit6:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Generating architecture recommendations..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt6)
-            st.subheader("Architecture & Technology Recommendations")
-            st.markdown("---")
-            st.markdown(response)
+def _parse_batch_response(raw, analyses):
+    """Return the non-empty string results for analyses from raw, or None if there are none."""
+    try:
+        results = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(results, dict):
+        return None
+    requested = {analysis.key for analysis in analyses}
+    results = {
+        key: text for key, text in results.items()
+        if key in requested and isinstance(text, str) and text
+    }
+    return results or None
+
+def _render_result_tabs(results, analyses):
+    tabs = st.tabs([analysis.title for analysis in analyses])
+    for tab, analysis in zip(tabs, analyses):
+        with tab:
+            st.markdown(results.get(analysis.key) or "_No result was returned for this analysis._")
+
+# Set by the pressed button's callback; popped so it only fires on this run
+action = st.session_state.pop("action", None)
+if action is not None:
+    st.session_state["_last_action"] = action
+
+if uploaded_file is not None:
+    responses = _session_responses()
+    # Responses depend on the document and the context, not on the button
+    # alone, so either changing makes a fresh request
+    response_key = (_uploaded_pdf_hash(uploaded_file), analysis_context)
+
+if action == "selected":
+    requested = selected_analyses
+elif action is not None:
+    requested = [ANALYSES_BY_KEY[action]]
+else:
+    requested = []
+
+# Prepare the document once, up front, and only when something requested
+# isn't already stored for this session
+if uploaded_file is not None and any(response_key + (analysis.key,) not in responses for analysis in requested):
+    pdf_content = input_pdf_setup(uploaded_file)
+else:
+    pdf_content = None
+
+if action == "selected":
+    if not selected_analyses:
+        st.warning("Select at least one analysis to run")
+    elif uploaded_file is not None:
+        stored = {
+            analysis.key: responses[response_key + (analysis.key,)]
+            for analysis in selected_analyses
+            if response_key + (analysis.key,) in responses
+        }
+        if len(stored) == len(selected_analyses):
+            _render_result_tabs(stored, selected_analyses)
+        elif pdf_content is not None:
+            if batch_all:
+                results = _run_all_batched(analysis_context, pdf_content, selected_analyses)
+            else:
+                results = _run_all_concurrently(analysis_context, pdf_content, selected_analyses)
+            for key, response in results.items():
+                responses[response_key + (key,)] = response
         else:
             st.error("Failed to process the PDF. Please try uploading a different file.")
     else:
         st.write("Please upload a document first")
-
-elif submit_roadmap:
-    if uploaded_file is not None:
-        pdf_content = input_pdf_setup(uploaded_file)
-        if pdf_content is not None:
-            with st.spinner("Creating implementation roadmap..."):
-                response = get_gemini_response(analysis_context, pdf_content, input_prompt_roadmap)
-            st.subheader("Implementation Roadmap & Project Planning")
-            st.markdown("---")
-            st.markdown(response)
-            
-            # Add download option for the roadmap
-            st.markdown("---")
-            st.markdown("##### Download Implementation Roadmap")
-            if st.button("Download as Text"):
-                st.download_button(
-                    label="Download Implementation Roadmap",
-                    data=response,
-                    file_name="implementation_roadmap.txt",
-                    mime="text/plain"
-                )
-        else:
-            st.error("Failed to process the PDF. Please try uploading a different file.")
+elif action is not None:
+    analysis = ANALYSES_BY_KEY[action]
+    if uploaded_file is None:
+        st.write(analysis.upload_hint)
+    elif response_key + (analysis.key,) in responses:
+        _render_analysis(analysis, responses[response_key + (analysis.key,)])
+    elif pdf_content is None:
+        st.error("Failed to process the PDF. Please try uploading a different file.")
     else:
-        st.write("Please upload a document first") 
\ No newline at end of file
+        st.markdown(result_heading(analysis.title))
+        outcome = {}
+        with st.spinner(analysis.spinner):
+            response = st.write_stream(stream_gemini_response(analysis_context, pdf_content, analysis.prompt, outcome))
+        # Errors and streams cut off midway are shown but never kept, so the
+        # next press asks Gemini again
+        if outcome["complete"]:
+            responses[response_key + (analysis.key,)] = response
+            _render_result_actions(analysis, response)
+elif uploaded_file is not None:
+    # A rerun from some other widget: redraw what was last shown, without
+    # querying Gemini, if it was generated for this document and context
+    last_action = st.session_state.get("_last_action")
+    if last_action == "selected":
+        results = {
+            analysis.key: responses[response_key + (analysis.key,)]
+            for analysis in selected_analyses
+            if response_key + (analysis.key,) in responses
+        }
+        if results:
+            _render_result_tabs(results, selected_analyses)
+    elif last_action is not None and response_key + (last_action,) in responses:
+        _render_analysis(ANALYSES_BY_KEY[last_action], responses[response_key + (last_action,)])
+
+# Rendered last so the counters include this run's lookups
+if RESPONSE_CACHE_ENABLED:
+    st.sidebar.markdown("### 🗄️ Response Cache")
+    hits_col, misses_col = st.sidebar.columns(2)
+    hits_col.metric("Hits", llm_cache.stats["hits"])
+    misses_col.metric("Misses", llm_cache.stats["misses"])
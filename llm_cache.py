@@ -0,0 +1,81 @@
+"""Content-addressed cache for Gemini responses.
+
+Responses are keyed by a SHA-256 of the model, the generation config, the
+document parts, the user context and the prompt. A small in-process LRU sits in front of an on-disk diskcache store,
+so repeated analyses return immediately and survive app restarts.
+
+This module is imported once per process, so the LRU and the hit/miss
+counters persist across Streamlit reruns.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import diskcache
+
+CACHE_DIR = ".llm_cache"
+TTL_SECONDS = 7 * 24 * 60 * 60
+MEMORY_ENTRIES = 256
+
+_disk = diskcache.Cache(CACHE_DIR)
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+stats = {"hits": 0, "misses": 0}
+
+
+def _update(digest, value):
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    # Length-prefix every field so adjacent fields can't run into each other
+    digest.update(len(value).to_bytes(8, "big"))
+    digest.update(value)
+
+
+def make_key(context, pdf_content, prompt, *, model, generation_config):
+    """Return the cache key for one Gemini request."""
+    digest = hashlib.sha256()
+    _update(digest, model)
+    _update(digest, json.dumps(generation_config, sort_keys=True))
+    for part in pdf_content:
+        if isinstance(part, dict):
+            _update(digest, part["mime_type"])
+            _update(digest, part["data"])
+        else:
+            _update(digest, part)
+    _update(digest, context)
+    _update(digest, prompt)
+    return digest.hexdigest()
+
+
+def lookup(key):
+    """Return the cached response for key, or None."""
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            stats["hits"] += 1
+            return _memory[key]
+
+    value = _disk.get(key)
+    with _lock:
+        if value is None:
+            stats["misses"] += 1
+            return None
+        stats["hits"] += 1
+        _remember(key, value)
+    return value
+
+
+def store(key, value):
+    """Cache a response in memory and on disk."""
+    _disk.set(key, value, expire=TTL_SECONDS)
+    with _lock:
+        _remember(key, value)
+
+
+def _remember(key, value):
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
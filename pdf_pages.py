@@ -0,0 +1,32 @@
+"""Page-level PDF text extraction and rendering.
+
+Both run in the Streamlit process, one page at a time, so only a single
+PyMuPDF page object is alive at once.
+"""
+import io
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+
+def iter_page_text(doc, start, stop):
+    """Yield the text of pages [start, stop), one page object alive at a time."""
+    for number in range(start, stop):
+        yield doc.load_page(number).get_text()
+
+
+def render_page_webp(doc, number, dpi, max_side, quality):
+    """Render one page as WebP bytes, scaled down so its long side fits max_side."""
+    page = doc.load_page(number)
+    zoom = dpi / 72
+    long_side = max(page.rect.width, page.rect.height) * zoom
+    if long_side > max_side:
+        zoom *= max_side / long_side
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    # PyMuPDF has no WebP writer of its own, so encode through Pillow.
+    # frombuffer wraps the pixmap's memory in place, where pil_tobytes
+    # would first copy out the raw RGB samples (several MB per page).
+    img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", pix.stride, 1)
+    buffer = io.BytesIO()
+    img.save(buffer, format="WEBP", quality=quality, method=4)
+    return buffer.getvalue()
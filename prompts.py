@@ -0,0 +1,705 @@
+"""Prompt templates for the IT Consulting Assistant analyses.
+
+Kept out of app.py so they are built once per process on import, instead of
+on every Streamlit rerun of the main script.
+"""
+import textwrap
+from typing import Final
+
+# Prompts are normalized once when defined: surrounding blank lines and any
+# common indentation would otherwise be uploaded with every request
+def _clean_prompt(text):
+    return textwrap.dedent(text).strip()
+
+# Email generation prompt
+EMAIL_PROMPT: Final[str] = _clean_prompt("""
+You are an IT Consulting Professional preparing a summary email for stakeholders about project understanding and next steps. Create a professional email that includes:
+
+SUBJECT: IT Project Analysis Summary - [Document Type] Review
+
+Dear [Stakeholder Name],
+
+I hope this email finds you well. I have completed the initial analysis of the [Document Type] and would like to provide you with a comprehensive understanding of the project scope and our recommended next steps.
+
+## Project Understanding Summary:
+[Provide a 3-4 line summary of the project scope, objectives, and key deliverables based on the document analysis]
+
+## Key Findings & Recommendations:
+[Present the main technical findings, architecture recommendations, and strategic insights in bullet points]
+
+## Critical Questions Requiring Your Input:
+[Create a table with the following columns]
+| Priority | Question/Clarification Needed | Impact | Recommended Action |
+|----------|------------------------------|--------|-------------------|
+[Fill with identified gaps and questions that need stakeholder clarification]
+
+## Technical Feasibility Assessment:
+- **Overall Feasibility:** [High/Medium/Low]
+- **Key Technical Challenges:** [List main technical hurdles]
+- **Resource Requirements:** [Skills, team size, timeline estimates]
+- **Risk Factors:** [Technical and business risks identified]
+
+## Recommended Implementation Approach:
+[Outline the proposed methodology, technology stack, and implementation phases]
+
+## Next Steps & Timeline:
+[Provide a clear action plan with specific deliverables and timelines]
+
+## Questions for Your Review:
+1. [Specific question about requirements or constraints]
+2. [Question about budget or timeline preferences]
+3. [Question about stakeholder availability or decision-making process]
+
+Please review the attached detailed analysis and provide your feedback on the above points, particularly regarding [mention 1-2 specific critical decisions needed].
+
+I am available for a detailed discussion at your convenience to address any questions or concerns.
+
+Best regards,
+[Your Name]
+IT Consulting Team
+
+Note: Please find the detailed technical analysis and recommendations attached to this email.
+
+Format this email professionally and ensure all critical information is clearly presented for stakeholder decision-making.
+""")
+
+# Analysis prompts
+# Every analysis prompt shares the same persona/structure scaffold; only the
+# role, task, section outline and closing instruction differ
+_ANALYSIS_PREAMBLE = """
+You are a {role}. {task}
+
+Please provide a {depth} analysis in the following structure:
+"""
+
+def _analysis_prompt(role, task, sections, closing, depth="detailed"):
+    return _clean_prompt(_ANALYSIS_PREAMBLE.format(role=role, task=task, depth=depth) + sections + "\n" + closing)
+
+def _roadmap_phase(title, weeks, duration, activities, deliverables):
+    lines = [f"### {title} (Weeks {weeks})", "- **Activities:**"]
+    lines += [f"  - {activity}" for activity in activities]
+    lines.append("- **Deliverables:**")
+    lines += [f"  - {deliverable}" for deliverable in deliverables]
+    lines += [
+        f"- **Timeline:** {duration} weeks",
+        "- **Resources:** [List required resources]",
+        "- **Risks:** [Identify risks and mitigation]",
+    ]
+    return "\n".join(lines) + "\n\n"
+
+BRD_PROMPT: Final[str] = _analysis_prompt(
+    role="Senior IT Consultant specializing in Business Requirements Document (BRD) analysis",
+    task="Analyze this BRD document and provide comprehensive insights for IT consulting projects.",
+    sections="""
+## 1. BRD Overview & Business Context
+- Document type and business domain
+- Primary business objectives and goals
+- Key stakeholders and end users
+- Current pain points or business challenges
+- Expected business outcomes and success metrics
+
+## 2. Business Process Analysis
+- Identify all major business processes from the BRD
+- Map current vs. desired state for each process
+- Highlight automation and optimization opportunities
+- Identify integration points between processes
+- Document process dependencies and workflows
+
+## 3. Functional Requirements Analysis
+- Core functional requirements breakdown
+- User stories and use cases identification
+- Business rules and constraints
+- Data requirements and flows
+- Reporting and analytics needs
+
+## 4. Non-Functional Requirements
+- Performance requirements
+- Security and compliance needs
+- Scalability considerations
+- Usability and accessibility requirements
+- Integration requirements
+
+## 5. Technology Implications
+- Current technology landscape assessment
+- Technology gaps and opportunities
+- Recommended technology stack considerations
+- Integration requirements with existing systems
+- Data migration and conversion needs
+
+## 6. Risk Assessment
+- Technical risks and challenges
+- Business risks and dependencies
+- Resource and timeline risks
+- Compliance and regulatory risks
+- Mitigation strategies
+
+## 7. Recommendations & Next Steps
+- Priority implementation recommendations
+- Phased approach suggestions
+- Resource requirements estimation
+- Timeline recommendations
+- Success criteria and KPIs
+""",
+    closing="Present your analysis in a structured format with clear sections, bullet points, and actionable recommendations for IT consulting projects."
+)
+
+CRD_PROMPT: Final[str] = _analysis_prompt(
+    role="Senior IT Consultant specializing in Customer Requirements Document (CRD) analysis",
+    task="Analyze this CRD document and provide comprehensive solution mapping and gap analysis for IT consulting projects.",
+    sections="""
+## 1. CRD Overview & Customer Context
+- Document type and customer domain
+- Primary customer objectives and pain points
+- Key customer stakeholders and decision makers
+- Current customer challenges and limitations
+- Expected customer outcomes and value proposition
+
+## 2. Customer Requirements Analysis
+- Functional requirements breakdown
+- Non-functional requirements assessment
+- User experience requirements
+- Integration requirements with customer systems
+- Data and reporting requirements
+
+## 3. Solution Mapping
+- Current customer solution assessment
+- Gap analysis between current and desired state
+- Solution architecture recommendations
+- Technology stack alignment with customer needs
+- Integration strategy with existing customer systems
+
+## 4. Customer Journey & User Experience
+- End-user journey mapping
+- User interface and experience requirements
+- Accessibility and usability considerations
+- Training and support requirements
+- Change management considerations
+
+## 5. Technical Feasibility Assessment
+- Technical complexity evaluation
+- Resource requirements estimation
+- Timeline feasibility assessment
+- Risk factors and mitigation strategies
+- Scalability and performance considerations
+
+## 6. Business Value Proposition
+- ROI analysis and business case
+- Cost-benefit analysis
+- Competitive advantages
+- Market positioning
+- Success metrics and KPIs
+
+## 7. Implementation Strategy
+- Phased implementation approach
+- Resource allocation recommendations
+- Timeline and milestone planning
+- Risk management strategies
+- Quality assurance and testing approach
+""",
+    closing="Present your analysis with clear recommendations for IT consulting projects, focusing on customer value and successful solution delivery."
+)
+
+TECHNICAL_PROMPT: Final[str] = _analysis_prompt(
+    role="Senior Technical Architect and IT Consultant specializing in technical document analysis",
+    task="Analyze this technical document and provide comprehensive technical insights and recommendations.",
+    sections="""
+## 1. Technical Document Overview
+- Document type and technical domain
+- Primary technical objectives
+- Target audience and stakeholders
+- Current technical challenges
+- Expected technical outcomes
+
+## 2. Technical Architecture Analysis
+- Current architecture assessment
+- Architecture patterns and design principles
+- Technology stack evaluation
+- Scalability and performance considerations
+- Security and compliance requirements
+
+## 3. System Design & Components
+- System components and modules
+- Data flow and integration points
+- API design and specifications
+- Database design and data modeling
+- Infrastructure requirements
+
+## 4. Technical Requirements Analysis
+- Functional technical requirements
+- Non-functional technical requirements
+- Performance and scalability requirements
+- Security and compliance requirements
+- Integration and interoperability requirements
+
+## 5. Technology Stack Recommendations
+- Programming languages and frameworks
+- Database and storage solutions
+- Cloud platform recommendations
+- DevOps and CI/CD tools
+- Monitoring and logging solutions
+
+## 6. Technical Risk Assessment
+- Technical complexity risks
+- Performance and scalability risks
+- Security and compliance risks
+- Integration and compatibility risks
+- Resource and skill requirements
+
+## 7. Implementation Recommendations
+- Development methodology recommendations
+- Technical implementation phases
+- Resource and skill requirements
+- Timeline and milestone planning
+- Quality assurance and testing strategy
+""",
+    closing="Present your analysis with technical depth and practical recommendations for IT consulting projects."
+)
+
+PRE_EXECUTION_PROMPT: Final[str] = _analysis_prompt(
+    role="Senior IT Project Manager and Business Analyst specializing in pre-execution project analysis",
+    task="Analyze this document and identify critical questions, gaps, and clarifications needed before project execution.",
+    depth="comprehensive",
+    sections="""
+## 1. Project Scope Analysis
+- Current scope understanding
+- Scope gaps and ambiguities
+- Missing requirements identification
+- Scope creep risk assessment
+- Scope validation questions
+
+## 2. Stakeholder Analysis & Communication
+- Key stakeholder identification
+- Stakeholder expectations alignment
+- Communication plan requirements
+- Decision-making process clarification
+- Stakeholder availability and commitment
+
+## 3. Technical Questions & Clarifications
+- Technical architecture decisions needed
+- Technology stack selection criteria
+- Integration requirements clarification
+- Performance and scalability requirements
+- Security and compliance requirements
+
+## 4. Resource & Timeline Questions
+- Team composition and skill requirements
+- Resource availability and allocation
+- Timeline feasibility and constraints
+- Budget allocation and approval process
+- External dependencies and vendors
+
+## 5. Risk & Compliance Questions
+- Technical risk mitigation strategies
+- Business risk assessment
+- Compliance and regulatory requirements
+- Legal and contractual considerations
+- Insurance and liability coverage
+
+## 6. Success Criteria & KPIs
+- Project success definition
+- Key performance indicators
+- Quality assurance criteria
+- User acceptance criteria
+- Go-live and deployment criteria
+
+## 7. Critical Questions Matrix
+Create a detailed table with the following columns:
+| Priority | Category | Question/Clarification | Impact | Owner | Timeline |
+|----------|----------|------------------------|--------|-------|----------|
+[Fill with specific questions that need stakeholder input]
+
+## 8. Recommended Next Steps
+- Immediate actions required
+- Stakeholder meetings needed
+- Documentation requirements
+- Approval processes
+- Timeline for clarifications
+""",
+    closing="Present your analysis with clear, actionable questions that will help ensure project success and stakeholder alignment."
+)
+
+FEASIBILITY_PROMPT: Final[str] = _analysis_prompt(
+    role="Senior IT Project Manager and Technical Architect specializing in project feasibility analysis",
+    task="Analyze this document and provide comprehensive feasibility assessment for IT consulting projects.",
+    sections="""
+## 1. Technical Feasibility Assessment
+- **Overall Technical Feasibility:** [High/Medium/Low]
+- Technology maturity and availability
+- Technical complexity evaluation
+- Integration feasibility with existing systems
+- Performance and scalability considerations
+- Security and compliance requirements
+
+## 2. Resource Feasibility Analysis
+- **Team Requirements:**
+  - Required skills and expertise
+  - Team size and composition
+  - Availability and allocation
+  - Training and knowledge transfer needs
+- **Infrastructure Requirements:**
+  - Hardware and software needs
+  - Cloud platform requirements
+  - Development and testing environments
+  - Production deployment requirements
+
+## 3. Timeline Feasibility Assessment
+- **Project Timeline Analysis:**
+  - Estimated project duration
+  - Critical path identification
+  - Milestone planning
+  - Dependencies and constraints
+- **Risk Factors:**
+  - Timeline risks and mitigation
+  - Resource availability risks
+  - Technical complexity risks
+  - External dependency risks
+
+## 4. Budget & Cost Feasibility
+- **Cost Breakdown:**
+  - Development costs
+  - Infrastructure costs
+  - Licensing and third-party costs
+  - Maintenance and support costs
+- **ROI Analysis:**
+  - Expected benefits
+  - Cost-benefit analysis
+  - Payback period
+  - Risk-adjusted returns
+
+## 5. Business Feasibility
+- **Business Case Validation:**
+  - Alignment with business objectives
+  - Stakeholder buy-in assessment
+  - Market and competitive analysis
+  - Regulatory and compliance requirements
+- **Change Management:**
+  - Organizational readiness
+  - User adoption considerations
+  - Training and support requirements
+  - Resistance and mitigation strategies
+
+## 6. Risk Assessment & Mitigation
+- **Technical Risks:**
+  - Technology risks and mitigation
+  - Integration risks and strategies
+  - Performance and scalability risks
+  - Security and compliance risks
+- **Business Risks:**
+  - Market and competitive risks
+  - Resource and timeline risks
+  - Stakeholder and change management risks
+  - Financial and budget risks
+
+## 7. Feasibility Recommendations
+- **Go/No-Go Decision Factors:**
+  - Critical success factors
+  - Deal-breaker conditions
+  - Risk tolerance assessment
+  - Alternative approaches
+- **Implementation Strategy:**
+  - Recommended approach
+  - Phased implementation plan
+  - Risk mitigation strategies
+  - Success monitoring plan
+""",
+    closing="Present your analysis with clear feasibility indicators, risk assessments, and actionable recommendations for project decision-making."
+)
+
+ARCHITECTURE_PROMPT: Final[str] = _analysis_prompt(
+    role="Senior Technical Architect and IT Consultant specializing in architecture and technology stack recommendations",
+    task="Analyze this document and provide comprehensive architecture and technology recommendations.",
+    sections="""
+## 1. Architecture Assessment & Recommendations
+- **Current Architecture Analysis:**
+  - Existing system architecture
+  - Architecture patterns evaluation
+  - Scalability and performance assessment
+  - Integration complexity analysis
+- **Recommended Architecture:**
+  - Architecture pattern selection
+  - Component design recommendations
+  - Data flow and integration design
+  - Security architecture considerations
+
+## 2. Technology Stack Recommendations
+- **Frontend Technologies:**
+  - Framework recommendations (React, Angular, Vue, etc.)
+  - UI/UX libraries and tools
+  - Mobile and responsive considerations
+  - Performance optimization tools
+- **Backend Technologies:**
+  - Programming languages (Java, Python, Node.js, etc.)
+  - Framework recommendations
+  - API design and management
+  - Microservices considerations
+- **Database & Storage:**
+  - Database type recommendations (SQL, NoSQL, etc.)
+  - Specific database technologies
+  - Data modeling considerations
+  - Backup and recovery strategies
+
+## 3. Cloud & Infrastructure Recommendations
+- **Cloud Platform:**
+  - Platform recommendations (AWS, Azure, GCP)
+  - Service selection and optimization
+  - Cost optimization strategies
+  - Multi-cloud considerations
+- **Infrastructure as Code:**
+  - IaC tools and practices
+  - Containerization strategies
+  - Orchestration platforms
+  - Monitoring and logging solutions
+
+## 4. Integration & API Strategy
+- **Integration Architecture:**
+  - API design patterns
+  - Integration middleware recommendations
+  - Data transformation and mapping
+  - Real-time vs. batch processing
+- **Third-Party Integrations:**
+  - Recommended third-party services
+  - API management and governance
+  - Security and authentication
+  - Rate limiting and throttling
+
+## 5. Security & Compliance Architecture
+- **Security Framework:**
+  - Authentication and authorization
+  - Data encryption and protection
+  - Network security considerations
+  - Compliance requirements (GDPR, HIPAA, etc.)
+- **DevSecOps Integration:**
+  - Security scanning and testing
+  - Vulnerability management
+  - Compliance monitoring
+  - Incident response planning
+
+## 6. Performance & Scalability Architecture
+- **Performance Optimization:**
+  - Caching strategies
+  - Load balancing recommendations
+  - Database optimization
+  - CDN and content delivery
+- **Scalability Planning:**
+  - Horizontal vs. vertical scaling
+  - Auto-scaling strategies
+  - Performance monitoring
+  - Capacity planning
+
+## 7. Implementation Roadmap
+- **Technology Adoption Strategy:**
+  - Phased implementation approach
+  - Technology migration planning
+  - Risk mitigation strategies
+  - Success criteria and KPIs
+- **Resource Planning:**
+  - Skill requirements and training
+  - Team composition recommendations
+  - Vendor and partner selection
+  - Timeline and milestone planning
+""",
+    closing="Present your analysis with specific technology recommendations, architecture diagrams where applicable, and implementation guidance for successful project delivery."
+)
+
+ROADMAP_PROMPT: Final[str] = _analysis_prompt(
+    role="Senior IT Project Manager and Technical Architect specializing in implementation roadmap development",
+    task="Analyze this document and provide a comprehensive implementation roadmap with detailed project planning and risk assessment.",
+    sections=(
+    """
+## 1. Project Overview & Scope
+- **Project Summary:**
+  - Project objectives and goals
+  - Scope boundaries and deliverables
+  - Key stakeholders and decision makers
+  - Success criteria and KPIs
+- **Business Case:**
+  - ROI analysis and business value
+  - Cost-benefit justification
+  - Risk-adjusted returns
+  - Strategic alignment
+
+## 2. Implementation Strategy
+- **Approach Selection:**
+  - Waterfall vs. Agile vs. Hybrid approach
+  - Phased implementation strategy
+  - Parallel vs. sequential execution
+  - Risk mitigation approach
+- **Methodology:**
+  - Development methodology (Scrum, Kanban, etc.)
+  - Quality assurance approach
+  - Testing strategy (Unit, Integration, UAT)
+  - Deployment strategy
+
+## 3. Detailed Implementation Roadmap
+
+"""
+    + _roadmap_phase(
+        "Phase 1: Foundation & Setup", "1-4", 4,
+        activities=[
+            "Project team formation and setup",
+            "Infrastructure and environment setup",
+            "Tool selection and configuration",
+            "Initial architecture design",
+        ],
+        deliverables=[
+            "Project charter and governance",
+            "Technical architecture document",
+            "Development environment setup",
+            "Team training and onboarding",
+        ]
+    )
+    + _roadmap_phase(
+        "Phase 2: Core Development", "5-16", 12,
+        activities=[
+            "Core system development",
+            "Database design and implementation",
+            "API development and integration",
+            "User interface development",
+        ],
+        deliverables=[
+            "Core system modules",
+            "Database schema and data",
+            "API documentation",
+            "UI/UX components",
+        ]
+    )
+    + _roadmap_phase(
+        "Phase 3: Integration & Testing", "17-20", 4,
+        activities=[
+            "System integration",
+            "Comprehensive testing",
+            "Performance optimization",
+            "Security testing",
+        ],
+        deliverables=[
+            "Integrated system",
+            "Test results and reports",
+            "Performance benchmarks",
+            "Security assessment",
+        ]
+    )
+    + _roadmap_phase(
+        "Phase 4: Deployment & Go-Live", "21-24", 4,
+        activities=[
+            "Production deployment",
+            "User acceptance testing",
+            "Training and documentation",
+            "Go-live support",
+        ],
+        deliverables=[
+            "Production system",
+            "User training materials",
+            "System documentation",
+            "Support procedures",
+        ]
+    )
+    + """## 4. Resource Planning & Allocation
+- **Team Structure:**
+  - Project Manager
+  - Technical Lead/Architect
+  - Developers (Frontend/Backend)
+  - QA Engineers
+  - DevOps Engineers
+  - Business Analysts
+- **Skill Requirements:**
+  - Technical skills and expertise
+  - Domain knowledge requirements
+  - Training and certification needs
+  - External consultant requirements
+- **Resource Timeline:**
+  - Resource allocation by phase
+  - Ramp-up and ramp-down planning
+  - Backup and contingency planning
+
+## 5. Risk Assessment & Mitigation
+- **Technical Risks:**
+  - Technology complexity risks
+  - Integration challenges
+  - Performance and scalability issues
+  - Security vulnerabilities
+- **Project Risks:**
+  - Timeline and scope risks
+  - Resource availability risks
+  - Stakeholder alignment risks
+  - Budget and cost risks
+- **Mitigation Strategies:**
+  - Risk prevention measures
+  - Contingency planning
+  - Escalation procedures
+  - Regular risk reviews
+
+## 6. Quality Assurance & Testing
+- **Testing Strategy:**
+  - Unit testing approach
+  - Integration testing plan
+  - User acceptance testing
+  - Performance testing
+- **Quality Gates:**
+  - Definition of Done criteria
+  - Quality checkpoints
+  - Review and approval processes
+  - Go-live readiness criteria
+
+## 7. Communication & Stakeholder Management
+- **Communication Plan:**
+  - Stakeholder communication matrix
+  - Reporting frequency and format
+  - Escalation procedures
+  - Change management approach
+- **Stakeholder Engagement:**
+  - Key stakeholder identification
+  - Engagement strategies
+  - Decision-making processes
+  - Conflict resolution procedures
+
+## 8. Budget & Cost Management
+- **Cost Breakdown:**
+  - Development costs
+  - Infrastructure costs
+  - Licensing and third-party costs
+  - Training and support costs
+- **Budget Management:**
+  - Cost tracking and monitoring
+  - Change request procedures
+  - Budget approval processes
+  - Cost optimization strategies
+
+## 9. Success Metrics & KPIs
+- **Project Success Metrics:**
+  - Timeline adherence
+  - Budget compliance
+  - Quality metrics
+  - Stakeholder satisfaction
+- **Business Success Metrics:**
+  - ROI achievement
+  - Business value delivery
+  - User adoption rates
+  - Performance improvements
+
+## 10. Post-Implementation Support
+- **Support Strategy:**
+  - Warranty period support
+  - Ongoing maintenance
+  - Enhancement planning
+  - Knowledge transfer
+- **Continuous Improvement:**
+  - Lessons learned documentation
+  - Process improvements
+  - Technology updates
+  - Future roadmap planning
+"""
+),
+    closing="Present your roadmap with clear timelines, resource requirements, risk assessments, and actionable next steps for successful project execution."
+)
+
+def build_batch_prompt(analyses):
+    """Combine (key, prompt) pairs into one request answered as a JSON object."""
+    keys = ", ".join(f'"{key}"' for key, _ in analyses)
+    sections = "\n\n".join(f"=== {key} ===\n{prompt}" for key, prompt in analyses)
+    return (
+        "Perform each of the analyses below on the same document. Respond with a "
+        f"single JSON object whose keys are {keys}; each value must be the complete "
+        "Markdown response to the analysis with that key, following its instructions "
+        "exactly as if it had been requested on its own.\n\n"
+        + sections
+    )
@@ -0,0 +1,31 @@
+"""Client-side request throttling for the Gemini API.
+
+Waiting for a free slot before sending is cheaper than sending, receiving a
+429 and backing off, so calls are paced to stay under the per-minute quota.
+"""
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """Thread-safe sliding-window limiter allowing max_calls per period seconds."""
+
+    def __init__(self, max_calls, period):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until another call fits in the window, then record it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                wait = self.period - (now - self._calls[0])
+            time.sleep(wait)